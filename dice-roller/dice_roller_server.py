@@ -2,16 +2,18 @@
 """
 Simple Dice Roller MCP Server - Roll dice, flip coins, and generate random outcomes for games
 """
-import os
+import re
 import sys
 import logging
 import random
-from datetime import datetime, timezone
+import contextvars
+from array import array
+from functools import lru_cache
 from mcp.server.fastmcp import FastMCP
 
-# Configure logging to stderr
+# Configure logging to stderr; per-call INFO chatter is off by default
 logging.basicConfig(
-    level=logging.INFO,
+    level=logging.WARNING,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     stream=sys.stderr
 )
@@ -22,47 +24,150 @@ mcp = FastMCP("dice_roller")
 
 # === UTILITY FUNCTIONS ===
 
+# Per-context PRNG so concurrent tool calls don't contend on the shared
+# module-level random state
+_rng_var = contextvars.ContextVar("rng")
+
+def _get_rng() -> random.Random:
+    """Return the random.Random instance for the current context, creating it lazily."""
+    rng = _rng_var.get(None)
+    if rng is None:
+        rng = random.Random()
+        _rng_var.set(rng)
+    return rng
+
 def roll_single_die(sides: int) -> int:
     """Roll a single die with the specified number of sides."""
-    return random.randint(1, sides)
+    return _get_rng().randrange(sides) + 1
+
+def _roll_many(sides: int, count: int) -> array:
+    """Roll `count` dice with `sides` sides in a single batch.
+
+    Draws raw bits directly with rejection sampling instead of making
+    `count` separate random.randint calls, which keeps the per-die cost
+    down to one PRNG draw for large batches. Rolls are packed into an
+    int16 array rather than a list of boxed ints (sides caps at 1000).
+    """
+    getrandbits = _get_rng().getrandbits
+    if sides & (sides - 1) == 0:
+        # Power of two: every bit pattern is a valid roll, no rejection needed
+        bits = sides.bit_length() - 1
+        return array('h', (getrandbits(bits) + 1 for _ in range(count)))
+
+    bits = sides.bit_length()
+    rolls = array('h')
+    append = rolls.append
+    while count:
+        r = getrandbits(bits)
+        if r < sides:
+            append(r + 1)
+            count -= 1
+    return rolls
+
+def _build_band_table(bands):
+    """Expand (upper_bound, label) bands into a 100-entry d100 lookup table."""
+    table = []
+    for upper, label in bands:
+        table.extend([label] * (upper - len(table)))
+    return tuple(table)
+
+# Precomputed d100 lookup tables: quality = table[roll - 1], no branching per call
+_LOOT_TABLES = {
+    "common": _build_band_table([
+        (60, "Poor quality item"),
+        (90, "Average quality item"),
+        (100, "Good quality item"),
+    ]),
+    "uncommon": _build_band_table([
+        (50, "Average quality item"),
+        (85, "Good quality item"),
+        (100, "Exceptional item! ✨"),
+    ]),
+    "rare": _build_band_table([
+        (40, "Good quality item"),
+        (80, "Exceptional item! ✨"),
+        (100, "Masterwork item! ⭐"),
+    ]),
+    "legendary": _build_band_table([
+        (30, "Exceptional item! ✨"),
+        (70, "Masterwork item! ⭐"),
+        (100, "Legendary artifact! 🏆"),
+    ]),
+}
+
+_PERCENTILE_TABLE = _build_band_table([
+    (5, "Critical Success! 🌟"),
+    (25, "Success ✅"),
+    (75, "Moderate 📊"),
+    (95, "Failure ❌"),
+    (100, "Critical Failure! 💥"),
+])
 
+# Advantage alias -> (pick roll, emoji, display name)
+_ADV_MAP = {
+    "advantage": (max, "⬆️", "Advantage"),
+    "adv": (max, "⬆️", "Advantage"),
+    "disadvantage": (min, "⬇️", "Disadvantage"),
+    "dis": (min, "⬇️", "Disadvantage"),
+    "disadv": (min, "⬇️", "Disadvantage"),
+}
+
+# Matches notation like '2d6', '1d20', or 'd8' (implicit count of 1)
+_DICE_RE = re.compile(r'^\s*(\d*)d(\d+)\s*$', re.IGNORECASE)
+
+# Pre-bound str.format templates for fixed-shape tool outputs; each format
+# string is parsed once at import instead of rebuilt per call
+_SINGLE_ROLL_TMPL = "🎲 Rolled {notation}: **{total}**".format
+_MULTI_ROLL_TMPL = "🎲 Rolled {notation}: [{rolls}] = **{total}**".format
+_STATS_TMPL = "🎲 D&D Ability Scores ({label}):\n{stats}\n\nTotal: {total} | Average: {avg:.1f}".format
+_ADV_TMPL = "{emoji} Rolling d{sides} with {name}:\nRolls: {roll1}, {roll2}\nResult: **{result}**".format
+_PCT_TMPL = "🎲 Percentile Roll (d100): **{result}**\n{quality}".format
+_LOOT_TMPL = "💎 Loot Roll ({rarity}):\nRoll: {roll}\nResult: {quality}".format
+
+@lru_cache(maxsize=256)
 def parse_dice_notation(notation: str):
     """Parse dice notation like '2d6' or '1d20' into count and sides."""
-    try:
-        notation = notation.strip().lower()
-        if 'd' not in notation:
-            return None, None
-        
-        parts = notation.split('d')
-        if len(parts) != 2:
-            return None, None
-        
-        count = int(parts[0]) if parts[0] else 1
-        sides = int(parts[1])
-        
-        if count < 1 or count > 100:
-            return None, None
-        if sides < 2 or sides > 1000:
-            return None, None
-        
-        return count, sides
-    except:
+    match = _DICE_RE.match(notation)
+    if match is None:
+        return None, None
+
+    count = int(match.group(1) or 1)
+    sides = int(match.group(2))
+
+    if count < 1 or count > 100:
         return None, None
+    if sides < 2 or sides > 1000:
+        return None, None
+
+    return count, sides
+
+def _roll_standard_stats() -> list:
+    """Roll 4d6-drop-lowest six times for the standard stat method.
+
+    Draws all 24 dice in one _roll_many batch and reduces each group of
+    four in a tight loop, rather than making 24 separate PRNG calls.
+    """
+    rolls = _roll_many(6, 24)
+    stats = []
+    for i in range(0, 24, 4):
+        group = rolls[i:i + 4]
+        stats.append(sum(group) - min(group))  # Drop lowest
+    return stats
 
 def format_roll_result(rolls, total, notation):
     """Format the result of a dice roll nicely."""
     if len(rolls) == 1:
-        return f"🎲 Rolled {notation}: **{total}**"
+        return _SINGLE_ROLL_TMPL(notation=notation, total=total)
     else:
-        rolls_str = ", ".join(str(r) for r in rolls)
-        return f"🎲 Rolled {notation}: [{rolls_str}] = **{total}**"
+        rolls_str = ", ".join(map(str, rolls))
+        return _MULTI_ROLL_TMPL(notation=notation, rolls=rolls_str, total=total)
 
 # === MCP TOOLS ===
 
 @mcp.tool()
 async def roll_dice(notation: str = "1d6") -> str:
     """Roll dice using standard notation like 1d20, 2d6, 3d8, etc."""
-    logger.info(f"Rolling dice: {notation}")
+    logger.info("Rolling dice: %s", notation)
     
     if not notation.strip():
         return "❌ Error: Please specify dice notation (e.g., 1d20, 2d6)"
@@ -73,7 +178,7 @@ async def roll_dice(notation: str = "1d6") -> str:
         if count is None or sides is None:
             return "❌ Error: Invalid dice notation. Use format like '1d20' or '2d6' (max 100 dice, 1000 sides)"
         
-        rolls = [roll_single_die(sides) for _ in range(count)]
+        rolls = _roll_many(sides, count)
         total = sum(rolls)
         
         return format_roll_result(rolls, total, notation)
@@ -85,7 +190,7 @@ async def roll_dice(notation: str = "1d6") -> str:
 @mcp.tool()
 async def flip_coin(count: str = "1") -> str:
     """Flip one or more coins and get heads or tails results."""
-    logger.info(f"Flipping {count} coin(s)")
+    logger.info("Flipping %s coin(s)", count)
     
     try:
         num_flips = int(count) if count.strip() else 1
@@ -93,16 +198,17 @@ async def flip_coin(count: str = "1") -> str:
         if num_flips < 1 or num_flips > 100:
             return "❌ Error: Count must be between 1 and 100"
         
-        flips = [random.choice(["Heads", "Tails"]) for _ in range(num_flips)]
-        
+        # One PRNG draw covers all flips: bit i of `bits` is coin i
+        bits = _get_rng().getrandbits(num_flips)
+
         if num_flips == 1:
-            result = flips[0]
+            result = "Heads" if bits else "Tails"
             emoji = "👑" if result == "Heads" else "🪙"
             return f"{emoji} Coin flip: **{result}**"
         else:
-            heads_count = flips.count("Heads")
-            tails_count = flips.count("Tails")
-            flips_str = ", ".join(flips)
+            heads_count = bits.bit_count()
+            tails_count = num_flips - heads_count
+            flips_str = ", ".join("Heads" if (bits >> i) & 1 else "Tails" for i in range(num_flips))
             return f"""🪙 Flipped {num_flips} coins:
 {flips_str}
 
@@ -117,55 +223,34 @@ Summary: {heads_count} Heads, {tails_count} Tails"""
 @mcp.tool()
 async def roll_stats(method: str = "standard") -> str:
     """Roll ability scores for D&D character creation using different methods."""
-    logger.info(f"Rolling stats with method: {method}")
+    logger.info("Rolling stats with method: %s", method)
     
     try:
         method = method.strip().lower()
         
         if method == "standard" or method == "":
             # Roll 4d6, drop lowest, six times
-            stats = []
-            for _ in range(6):
-                rolls = [roll_single_die(6) for _ in range(4)]
-                rolls.sort()
-                stat = sum(rolls[1:])  # Drop lowest
-                stats.append(stat)
-            
-            stats_str = ", ".join(str(s) for s in stats)
-            total = sum(stats)
-            avg = total / 6
-            
-            return f"""🎲 D&D Ability Scores (4d6 drop lowest):
-{stats_str}
-
-Total: {total} | Average: {avg:.1f}"""
-        
+            stats = _roll_standard_stats()
+            label = "4d6 drop lowest"
+
         elif method == "heroic":
             # Roll 2d6+6, six times
-            stats = [roll_single_die(6) + roll_single_die(6) + 6 for _ in range(6)]
-            stats_str = ", ".join(str(s) for s in stats)
-            total = sum(stats)
-            avg = total / 6
-            
-            return f"""🎲 D&D Ability Scores (2d6+6):
-{stats_str}
-
-Total: {total} | Average: {avg:.1f}"""
-        
+            rolls = _roll_many(6, 12)
+            stats = [rolls[i] + rolls[i + 1] + 6 for i in range(0, 12, 2)]
+            label = "2d6+6"
+
         elif method == "straight":
             # Roll 3d6, six times
-            stats = [sum([roll_single_die(6) for _ in range(3)]) for _ in range(6)]
-            stats_str = ", ".join(str(s) for s in stats)
-            total = sum(stats)
-            avg = total / 6
-            
-            return f"""🎲 D&D Ability Scores (3d6):
-{stats_str}
-
-Total: {total} | Average: {avg:.1f}"""
-        
+            rolls = _roll_many(6, 18)
+            stats = [rolls[i] + rolls[i + 1] + rolls[i + 2] for i in range(0, 18, 3)]
+            label = "3d6"
+
         else:
             return "❌ Error: Invalid method. Use 'standard', 'heroic', or 'straight'"
+
+        total = sum(stats)
+        return _STATS_TMPL(label=label, stats=", ".join(map(str, stats)),
+                           total=total, avg=total / 6)
     
     except Exception as e:
         logger.error(f"Error rolling stats: {e}")
@@ -174,7 +259,7 @@ Total: {total} | Average: {avg:.1f}"""
 @mcp.tool()
 async def roll_with_advantage(sides: str = "20", advantage_type: str = "advantage") -> str:
     """Roll with advantage or disadvantage (roll twice, take higher/lower)."""
-    logger.info(f"Rolling with {advantage_type}")
+    logger.info("Rolling with %s", advantage_type)
     
     try:
         num_sides = int(sides) if sides.strip() else 20
@@ -185,22 +270,15 @@ async def roll_with_advantage(sides: str = "20", advantage_type: str = "advantag
         roll1 = roll_single_die(num_sides)
         roll2 = roll_single_die(num_sides)
         
-        adv_type = advantage_type.strip().lower()
-        
-        if adv_type == "advantage" or adv_type == "adv":
-            result = max(roll1, roll2)
-            emoji = "⬆️"
-            type_name = "Advantage"
-        elif adv_type == "disadvantage" or adv_type == "dis" or adv_type == "disadv":
-            result = min(roll1, roll2)
-            emoji = "⬇️"
-            type_name = "Disadvantage"
-        else:
+        entry = _ADV_MAP.get(advantage_type.strip().lower())
+        if entry is None:
             return "❌ Error: Type must be 'advantage' or 'disadvantage'"
-        
-        return f"""{emoji} Rolling d{num_sides} with {type_name}:
-Rolls: {roll1}, {roll2}
-Result: **{result}**"""
+
+        pick, emoji, type_name = entry
+        result = pick(roll1, roll2)
+
+        return _ADV_TMPL(emoji=emoji, sides=num_sides, name=type_name,
+                         roll1=roll1, roll2=roll2, result=result)
     
     except ValueError:
         return f"❌ Error: Invalid sides value: {sides}"
@@ -214,21 +292,10 @@ async def percentile_roll() -> str:
     logger.info("Rolling percentile dice")
     
     try:
-        result = random.randint(1, 100)
-        
-        if result <= 5:
-            quality = "Critical Success! 🌟"
-        elif result <= 25:
-            quality = "Success ✅"
-        elif result <= 75:
-            quality = "Moderate 📊"
-        elif result <= 95:
-            quality = "Failure ❌"
-        else:
-            quality = "Critical Failure! 💥"
-        
-        return f"""🎲 Percentile Roll (d100): **{result}**
-{quality}"""
+        result = roll_single_die(100)
+        quality = _PERCENTILE_TABLE[result - 1]
+
+        return _PCT_TMPL(result=result, quality=quality)
     
     except Exception as e:
         logger.error(f"Error rolling percentile: {e}")
@@ -237,7 +304,7 @@ async def percentile_roll() -> str:
 @mcp.tool()
 async def roll_initiative(bonus: str = "0", count: str = "1") -> str:
     """Roll initiative for combat (d20 + bonus) for one or more characters."""
-    logger.info(f"Rolling initiative for {count} character(s)")
+    logger.info("Rolling initiative for %s character(s)", count)
     
     try:
         num_count = int(count) if count.strip() else 1
@@ -249,26 +316,22 @@ async def roll_initiative(bonus: str = "0", count: str = "1") -> str:
         if bonus_val < -10 or bonus_val > 20:
             return "❌ Error: Bonus must be between -10 and +20"
         
-        initiatives = []
-        for i in range(num_count):
-            roll = roll_single_die(20)
-            total = roll + bonus_val
-            initiatives.append((i + 1, roll, total))
-        
-        # Sort by total (descending)
-        initiatives.sort(key=lambda x: x[2], reverse=True)
-        
+        bonus_str = f"+{bonus_val}" if bonus_val >= 0 else str(bonus_val)
+
+        rolls = _roll_many(20, num_count)
+        totals = [roll + bonus_val for roll in rolls]
+
         if num_count == 1:
-            _, roll, total = initiatives[0]
-            bonus_str = f"+{bonus_val}" if bonus_val >= 0 else str(bonus_val)
-            return f"⚔️ Initiative: {roll} {bonus_str} = **{total}**"
-        else:
-            result_lines = ["⚔️ Initiative Order:"]
-            for char_num, roll, total in initiatives:
-                bonus_str = f"+{bonus_val}" if bonus_val >= 0 else str(bonus_val)
-                result_lines.append(f"Character {char_num}: {roll} {bonus_str} = **{total}**")
-            
-            return "\n".join(result_lines)
+            return f"⚔️ Initiative: {rolls[0]} {bonus_str} = **{totals[0]}**"
+
+        # Sort by total (descending): order indices instead of building tuples
+        order = sorted(range(num_count), key=totals.__getitem__, reverse=True)
+
+        result_lines = ["⚔️ Initiative Order:"]
+        for idx in order:
+            result_lines.append(f"Character {idx + 1}: {rolls[idx]} {bonus_str} = **{totals[idx]}**")
+
+        return "\n".join(result_lines)
     
     except ValueError as ve:
         return f"❌ Error: Invalid number value"
@@ -293,7 +356,16 @@ async def random_choice(options: str = "") -> str:
         if len(choices) > 50:
             return "❌ Error: Maximum 50 options allowed"
         
-        choice = random.choice(choices)
+        # Pick an index from raw bits with rejection sampling, skipping the
+        # generic machinery inside random.choice
+        n = len(choices)
+        getrandbits = _get_rng().getrandbits
+        k = (n - 1).bit_length()
+        while True:
+            i = getrandbits(k)
+            if i < n:
+                break
+        choice = choices[i]
         
         return f"""🎯 Random Choice:
 Options: {', '.join(choices)}
@@ -306,53 +378,19 @@ Selected: **{choice}**"""
 @mcp.tool()
 async def roll_loot(rarity: str = "common") -> str:
     """Generate random loot quality based on rarity tier."""
-    logger.info(f"Rolling for {rarity} loot")
+    logger.info("Rolling for %s loot", rarity)
     
     try:
-        rarity_level = rarity.strip().lower()
-        
-        if rarity_level == "common" or rarity_level == "":
-            roll = roll_single_die(100)
-            if roll <= 60:
-                quality = "Poor quality item"
-            elif roll <= 90:
-                quality = "Average quality item"
-            else:
-                quality = "Good quality item"
-        
-        elif rarity_level == "uncommon":
-            roll = roll_single_die(100)
-            if roll <= 50:
-                quality = "Average quality item"
-            elif roll <= 85:
-                quality = "Good quality item"
-            else:
-                quality = "Exceptional item! ✨"
-        
-        elif rarity_level == "rare":
-            roll = roll_single_die(100)
-            if roll <= 40:
-                quality = "Good quality item"
-            elif roll <= 80:
-                quality = "Exceptional item! ✨"
-            else:
-                quality = "Masterwork item! ⭐"
-        
-        elif rarity_level == "legendary":
-            roll = roll_single_die(100)
-            if roll <= 30:
-                quality = "Exceptional item! ✨"
-            elif roll <= 70:
-                quality = "Masterwork item! ⭐"
-            else:
-                quality = "Legendary artifact! 🏆"
-        
-        else:
+        rarity_level = rarity.strip().lower() or "common"
+
+        table = _LOOT_TABLES.get(rarity_level)
+        if table is None:
             return "❌ Error: Rarity must be 'common', 'uncommon', 'rare', or 'legendary'"
-        
-        return f"""💎 Loot Roll ({rarity_level.capitalize()}):
-Roll: {roll}
-Result: {quality}"""
+
+        roll = roll_single_die(100)
+        quality = table[roll - 1]
+
+        return _LOOT_TMPL(rarity=rarity_level.capitalize(), roll=roll, quality=quality)
     
     except Exception as e:
         logger.error(f"Error rolling loot: {e}")